@@ -10,17 +10,18 @@ DiskTool  –  v4.5
  • Avoids double “.dsk.DSK” by passing a base-name to SugarConvDsk
  • Default fallback SugarConvDsk:
      ~/Desktop/SugarConvDsk/build/SugarConvDsk/SugarConvDsk
+ • Headless: `disktool.py --no-gui` images one disk, `--check` runs pre-flight;
+   Tk is only imported when the GUI starts
 """
 
 __VERSION__ = "4.5"
 
 # ───────── imports ─────────
-import os, sys, json, shlex, hashlib, time, subprocess, threading, datetime, shutil
+import os, sys, json, shlex, hashlib, time, subprocess, threading, datetime, shutil, functools, string, codecs, argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List, Tuple, Dict, Any
-import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext, ttk
-import tkinter.font as tkfont
+# tkinter is imported by _imager_class() only when the GUI actually starts
 # ───────────────────────────
 
 # ───────── constants ───────
@@ -29,6 +30,12 @@ DEFAULT_TRACKS_ARG    = "c=0-39:h=0"
 DEFAULT_REVS          = 3
 DEFAULT_BASENAME_PRE  = "Einstein"
 CONFIG_PATH           = Path.home() / ".einstein_imager_config.json"
+# integrity fingerprint only, one digest per image: SHA-256 uses SHA-NI/ARMv8
+# crypto where present; use ("blake2b",) instead on CPUs without them
+HASH_ALGOS            = ("sha256",)
+HASH_CHUNK            = 4 << 20      # readinto() size for the multi-digest loop only;
+                                     # single digests use hashlib.file_digest (3.11+)
+LOG_FLUSH_MS          = 50           # Live-output pane repaint interval
 
 SUGAR_FALLBACKS = [
     Path.home() / "Desktop/SugarConvDsk/build/SugarConvDsk/SugarConvDsk",
@@ -53,6 +60,7 @@ def _maybe_exe(p: Path) -> Path:
         pass
     return p
 
+@functools.lru_cache(maxsize=1)
 def desktop_path() -> Path:
     try:
         p = Path.home() / "Desktop";  p.mkdir(exist_ok=True)
@@ -63,262 +71,441 @@ def desktop_path() -> Path:
 def ts_string() -> str:
     return datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
-def load_cfg() -> dict:
+_last_cfg_digest: Optional[bytes] = None    # of the bytes last read from / written to CONFIG_PATH
+
+def _cfg_digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+@functools.lru_cache(maxsize=1)
+def _load_cfg_cached() -> dict:
+    global _last_cfg_digest
     if CONFIG_PATH.exists():
-        try:  return json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
+        try:
+            data = CONFIG_PATH.read_bytes();  _last_cfg_digest = _cfg_digest(data)
+            return json.loads(data.decode("utf-8"))
         except Exception:  pass
     return {}
 
+def load_cfg() -> dict:
+    return dict(_load_cfg_cached())     # callers mutate; never hand out the cached one
+
+def invalidate_cfg_cache() -> None:
+    _load_cfg_cached.cache_clear()
+
+def write_atomic(p: Path, data: bytes) -> None:
+    # write-then-rename so a crash never leaves a torn file behind
+    tmp = p.with_name(p.name + ".tmp")
+    try:
+        with open(tmp, "wb") as f:  f.write(data)
+        os.replace(tmp, p)
+    except BaseException:
+        try: tmp.unlink()
+        except OSError: pass
+        raise
+
 def save_cfg(cfg: dict) -> None:
-    try: CONFIG_PATH.write_text(json.dumps(cfg, indent=2), encoding="utf-8")
+    # skip no-op rewrites
+    global _last_cfg_digest
+    data   = json.dumps(cfg, indent=2).encode("utf-8")
+    digest = _cfg_digest(data)
+    if digest == _last_cfg_digest:  return
+    try:
+        write_atomic(CONFIG_PATH, data);  _last_cfg_digest = digest
     except Exception: pass
+    invalidate_cfg_cache()
+
+@functools.lru_cache(maxsize=16)
+def compile_template(tmpl: str) -> Optional[Tuple[Tuple[str,Optional[str]],...]]:
+    # (literal, key) pairs parsed once per template text; None => needs full str.format
+    parts = []
+    for lit, key, spec, conv in string.Formatter().parse(tmpl):
+        if key is not None and (spec or conv or any(c in key for c in ".[")): return None
+        parts.append((lit, key))
+    return tuple(parts)
+
+def fill_template(tmpl: str, subs: Dict[str,Any]) -> str:
+    parts = compile_template(tmpl)
+    if parts is None:  return tmpl.format(**subs)
+    return "".join(lit + (str(subs[k]) if k is not None else "") for lit,k in parts)
 
 def shjoin(parts: List[str]) -> str:       # for display only
     return " ".join(shlex.quote(p) for p in parts)
 
-def file_hashes(p: Path) -> Dict[str,str]:
-    md5, sha1, sha256 = hashlib.md5(), hashlib.sha1(), hashlib.sha256()
-    with p.open("rb") as f:
-        for chunk in iter(lambda: f.read(1<<20), b""):
-            md5.update(chunk);  sha1.update(chunk);  sha256.update(chunk)
-    return dict(md5=md5.hexdigest(), sha1=sha1.hexdigest(), sha256=sha256.hexdigest())
+def _new_hash(algo: str):
+    if algo == "blake2b":  return hashlib.blake2b(digest_size=32)
+    return hashlib.new(algo)
+
+def hash_file(p: Path, algos=HASH_ALGOS) -> Dict[str,str]:
+    with open(p, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            try: os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError: pass
+        if len(algos) == 1 and hasattr(hashlib, "file_digest"):  # Py 3.11+: loop runs in C
+            return {algos[0]: hashlib.file_digest(f, lambda: _new_hash(algos[0])).hexdigest()}
+        # one read pass feeding every digest; a single reused buffer, no per-chunk bytes
+        hs  = {a: _new_hash(a) for a in algos}
+        buf = bytearray(HASH_CHUNK);  mv = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n: break
+            for h in hs.values():  h.update(mv[:n])
+    return {a: h.hexdigest() for a,h in hs.items()}
 
-def run_stream(cmd: List[str], cb, env=None) -> int:
+def file_hashes(p: Path) -> Dict[str,str]:
+    return hash_file(p, HASH_ALGOS)
+
+class _LineSplitter:
+    # binary pipe, one decode per chunk; \r and \r\n become \n as with text=True
+    def __init__(self, cb):
+        self.cb = cb;  self.buf = ""
+        self.dec = codecs.getincrementaldecoder("utf-8")("replace")
+
+    def feed(self, chunk: bytes) -> None:
+        buf  = self.buf + self.dec.decode(chunk)
+        hold = buf.endswith("\r")                 # could be the first half of \r\n
+        lines = (buf[:-1] if hold else buf).replace("\r\n","\n").replace("\r","\n").split("\n")
+        self.buf = lines.pop() + ("\r" if hold else "")
+        for line in lines:  self.cb(line)
+
+    def close(self) -> None:
+        buf = self.buf + self.dec.decode(b"", final=True);  self.buf = ""
+        if buf.endswith("\r"):  self.cb(buf[:-1])      # held \r ends a line, even an empty one
+        elif buf:  self.cb(buf)
+
+def _launch(cmd: List[str], cb, env=None):
     try:
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
-                                stderr=subprocess.STDOUT, text=True, env=env)
+        return subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, env=env)
     except FileNotFoundError as e:
         cb(f"Executable not found: {cmd[0]}\n{e}"); return 127
     except Exception as e:
         cb(f"Launch error {cmd!r}: {e}");           return 1
-    for line in proc.stdout:  cb(line.rstrip("\n"))
-    proc.wait();  return proc.returncode
 
-def run_cap(cmd: List[str]) -> Tuple[int,str]:
-    try:
-        p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                           text=True, check=False)
-        return p.returncode, p.stdout
-    except Exception as e:
-        return 1, str(e)
+def _drain(proc, cb) -> int:
+    sp = _LineSplitter(cb)
+    for chunk in iter(lambda: proc.stdout.read1(1<<16), b""):  sp.feed(chunk)
+    sp.close()
+    return proc.wait()
+
+def run_stream(cmd: List[str], cb, env=None, label: Optional[str]=None) -> int:
+    if label:  cb(f"\nRunning ({label}): {shjoin(cmd)}")     # quoted once, here only
+    proc = _launch(cmd, cb, env)
+    return proc if isinstance(proc, int) else _drain(proc, cb)
+
+def run_cap_many(cmds: List[List[str]]) -> List[Tuple[int,str]]:
+    # launch every probe up front, then collect; wall time ≈ the slowest one
+    procs = []
+    for cmd in cmds:
+        try:
+            procs.append(subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                          stderr=subprocess.STDOUT))
+        except Exception as e:
+            procs.append(e)
+    res = []
+    for p in procs:
+        if isinstance(p, Exception):  res.append((1, str(p)));  continue
+        try:
+            out = p.communicate()[0].decode("utf-8", "replace");  res.append((p.returncode, out))
+        except Exception as e:
+            res.append((1, str(e)))
+    return res
 
 def help_ok(out: str) -> bool:
     return any(k in out for k in ("Usage:", "Actions:", "Greaseweazle"))
 
 def detect_output(exp: Path, base: str) -> Optional[Path]:
-    if exp.exists(): return exp
+    # one directory read serves both the exact-name probes and the fallback scan
     desk = exp.parent
-    for suf in (".DSK",".dsk",".EDSK",".edsk",".dsk.DSK",".edsk.EDSK"):
-        p = desk / f"{base}{suf}"
-        if p.exists(): return p
-    for p in desk.glob(f"{base}*"):
-        if p.is_file() and any(x in p.suffix.lower() for x in ("dsk","edsk")):
-            return p
+    try:
+        with os.scandir(desk) as it:
+            files = [e.name for e in it if e.is_file()]
+    except OSError:
+        return None
+    names = set(files)
+    for n in (exp.name,) + tuple(f"{base}{suf}" for suf in
+              (".DSK",".dsk",".EDSK",".edsk",".dsk.DSK",".edsk.EDSK")):
+        if n in names: return desk / n
+    for n in files:
+        if n.startswith(base) and "dsk" in os.path.splitext(n)[1].lower():
+            return desk / n
     return None
+
+def cfg_defaults(c: dict) -> dict:
+    c.setdefault("custom_gw","")
+    c.setdefault("custom_sugar", str(SUGAR_FALLBACKS[0]))
+    c.setdefault("drive", DEFAULT_DRIVE_INDEX)
+    c.setdefault("tracks", DEFAULT_TRACKS_ARG)
+    c.setdefault("revs",  DEFAULT_REVS)
+    if "basename" not in c:     # setdefault would read the clock on every call
+        c["basename"] = f"{DEFAULT_BASENAME_PRE}_{ts_string()}"
+    # upgrade old read template
+    read_tmpl = c.get("read_cmd","gw read --drive={drive} --tracks={tracks} --revs={revs} {scp}")
+    if read_tmpl.startswith("gw read "):
+        read_tmpl = "{gw} " + read_tmpl[3:]
+    c["read_cmd"] = read_tmpl
+    c.setdefault("convert_cmd", "{sugar} {scp} {dsk} -o=EDSK")
+    return c
+
+def resolve_exe(name: str, custom: str) -> Tuple[Optional[str],str]:
+    msgs=[]
+    p = shutil.which(name)
+    if p:
+        msgs.append(f"✅ {name} found on PATH: {p}")
+        return p, msgs[-1]
+    if name=="SugarConvDsk" and not custom:
+        for c in SUGAR_FALLBACKS:
+            c = _maybe_exe(Path(c))
+            if c.exists() and os.access(str(c), os.X_OK):
+                msgs.append(f"✅ {name} resolved via fallback: {c}")
+                return str(c), msgs[-1]
+    if custom:
+        cp = _maybe_exe(Path(custom).expanduser())
+        if cp.exists() and os.access(str(cp), os.X_OK):
+            msgs.append(f"✅ {name} resolved via custom path: {cp}")
+            return str(cp), msgs[-1]
+        msgs.append(f"❌ custom path for {name} is not executable: {cp}")
+    else:
+        msgs.append(f"❌ {name} not found. Provide a path.")
+    return None, msgs[-1]
+
+def preflight(cfg: dict, log_cb=print, resolve=resolve_exe) -> Tuple[bool,Optional[str],Optional[str]]:
+    ok=True; msgs=[]
+    gw, m = resolve("gw", cfg["custom_gw"]); msgs.append(m)
+    if not gw: ok=False
+    else:
+        (rc,out),(rc2,out2) = run_cap_many([[gw,"--help"],[gw,"info"]])
+        if not help_ok(out): ok=False; msgs.append("❌ 'gw --help' failed")
+        elif rc2!=0: ok=False; msgs.append("❌ 'gw info' failed (device?)")
+    sugar,m = resolve("SugarConvDsk", cfg["custom_sugar"]); msgs.append(m)
+    if not sugar: ok=False
+    log_cb("\n".join(msgs))
+    return ok, gw, sugar
+
+def run_imaging(cfg: dict, log_cb=print, resolve=resolve_exe) -> str:
+    """Read, convert and fingerprint one disk; returns the final status text."""
+    gw,_ = resolve("gw", cfg["custom_gw"]); sugar,_ = resolve("SugarConvDsk", cfg["custom_sugar"])
+    if not (gw and sugar):
+        log_cb("Executables unresolved."); return "Pre-flight failed"
+    # paths & subs
+    desk=desktop_path(); base=str(cfg["basename"]).strip() or f"{DEFAULT_BASENAME_PRE}_{ts_string()}"
+    scp=desk/f"{base}.scp"; outbase=desk/base; exp_dsk=desk/f"{base}.DSK"; scp_s=str(scp)
+    subs=dict(gw=gw,sugar=sugar,scp=scp_s,dsk=str(outbase),
+              drive=str(cfg["drive"]).strip() or DEFAULT_DRIVE_INDEX,
+              tracks=str(cfg["tracks"]).strip() or DEFAULT_TRACKS_ARG,
+              revs=str(cfg["revs"]).strip() or DEFAULT_REVS)
+    # honour custom template
+    read_cmd=split_cmd(fill_template(cfg["read_cmd"],subs))
+    conv_cmd=split_cmd(fill_template(cfg["convert_cmd"],subs))
+    t0=time.monotonic(); rc=run_stream(read_cmd,log_cb,label="read"); t1=time.monotonic(); log_cb(f"[exit {rc} in {t1-t0:.1f}s]")
+    if rc or not scp.exists(): log_cb("Read failed."); return "Read failed"
+    # hash the SCP while SugarConvDsk runs (file is still hot in page cache),
+    # then the DSK alongside it; hashlib drops the GIL on big buffers
+    # (a hash already running can't be interrupted; the process still joins it at exit)
+    ex=ThreadPoolExecutor(max_workers=2)
+    try:
+        f_scp=ex.submit(file_hashes,scp)
+        rc2=run_stream(conv_cmd,log_cb,label="convert"); t2=time.monotonic(); log_cb(f"[exit {rc2} in {t2-t1:.1f}s]")
+        dsk=detect_output(exp_dsk,base)
+        if rc2 or not dsk: log_cb("Convert failed."); return "Convert failed"
+        f_dsk=ex.submit(file_hashes,dsk)
+        h_scp,h_dsk=f_scp.result(),f_dsk.result()
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
+    # summary
+    def fmt(n,h): return f"{n}\n" + "".join(f"  {a.upper()} {d}\n" for a,d in h.items())
+    log_cb("\n"+fmt("SCP",h_scp)+fmt("DSK",h_dsk))
+    # save session
+    sess={"version":__VERSION__,"scp":scp_s,"dsk":str(dsk),"hashes":{"scp":h_scp,"dsk":h_dsk}}
+    try:
+        write_atomic(desk/f"{base}_session.json", json.dumps(sess,indent=2).encode("utf-8"))
+    except OSError as e:
+        log_cb(f"Session not saved: {e}"); return "Session save failed"
+    log_cb("===== Imaging complete =====")
+    return "Done"
+
+def __getattr__(name: str):
+    # `disktool.Imager` is built on first access, so importing this module
+    # never loads tkinter
+    if name == "Imager":  return _imager_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 # ───────────────────────────
 
-class Imager(ttk.Frame):
-    def __init__(self, master):
-        super().__init__(master)
-        self.master = master
-        self.cfg = self._defaults(load_cfg())
-        self._ui()
-        self.append("Einstein Disk Imager v" + __VERSION__)
-        self.master.after(200, self.run_checks)
-
-    # ---------- config ----------
-    def _defaults(self, c: dict) -> dict:
-        c.setdefault("custom_gw","")
-        c.setdefault("custom_sugar", str(SUGAR_FALLBACKS[0]))
-        c.setdefault("drive", DEFAULT_DRIVE_INDEX)
-        c.setdefault("tracks", DEFAULT_TRACKS_ARG)
-        c.setdefault("revs",  DEFAULT_REVS)
-        c.setdefault("basename", f"{DEFAULT_BASENAME_PRE}_{ts_string()}")
-        # upgrade old read template
-        read_tmpl = c.get("read_cmd","gw read --drive={drive} --tracks={tracks} --revs={revs} {scp}")
-        if read_tmpl.startswith("gw read "):
-            read_tmpl = "{gw} " + read_tmpl[3:]
-        c["read_cmd"] = read_tmpl
-        c.setdefault("convert_cmd", "{sugar} {scp} {dsk} -o=EDSK")
-        return c
-
-    # ---------- UI ----------
-    def _ui(self):
-        self.master.title(f"Einstein Disk Imager v{__VERSION__}")
-        style = ttk.Style()
-        if "vista" in style.theme_names():  style.theme_use("vista")
-        self.master.geometry("900x720"); self.master.minsize(860,640)
-
-        f = ttk.Frame(self, padding=8);  f.pack(fill="both", expand=True)
-        f.columnconfigure(0, weight=1)
-        # Executables
-        g = ttk.LabelFrame(f, text="Executables"); g.grid(row=0,column=0,sticky="ew")
-        for col in (1,): g.columnconfigure(col, weight=1)
-        self.gw_lab  = tk.StringVar();  self.sugar_lab = tk.StringVar()
-        ttk.Label(g,text="Resolved gw").grid(row=0,column=0,sticky="w"); ttk.Label(g,textvariable=self.gw_lab).grid(row=0,column=1,sticky="w")
-        ttk.Label(g,text="Resolved SugarConvDsk").grid(row=1,column=0,sticky="w"); ttk.Label(g,textvariable=self.sugar_lab).grid(row=1,column=1,sticky="w")
-        ttk.Label(g,text="Custom gw path (optional)").grid(row=2,column=0,sticky="w",pady=4)
-        self.custom_gw = tk.StringVar(value=self.cfg["custom_gw"])
-        ttk.Entry(g,textvariable=self.custom_gw).grid(row=2,column=1,sticky="ew"); ttk.Button(g,text="Browse…",command=self.browse_gw).grid(row=2,column=2)
-        ttk.Label(g,text="Custom SugarConvDsk path (optional)").grid(row=3,column=0,sticky="w")
-        self.custom_sugar = tk.StringVar(value=self.cfg["custom_sugar"])
-        ttk.Entry(g,textvariable=self.custom_sugar).grid(row=3,column=1,sticky="ew"); ttk.Button(g,text="Browse…",command=self.browse_sugar).grid(row=3,column=2)
-        ttk.Button(g,text="Recheck",command=self.run_checks).grid(row=4,column=0,sticky="w",pady=6)
-
-        # Parameters
-        p = ttk.LabelFrame(f,text="Output and parameters"); p.grid(row=1,column=0,sticky="ew",pady=6)
-        p.columnconfigure(1, weight=1)
-        ttk.Label(p,text="Base name").grid(row=0,column=0,sticky="e")
-        self.basename = tk.StringVar(value=self.cfg["basename"])
-        ttk.Entry(p,textvariable=self.basename).grid(row=0,column=1,columnspan=5,sticky="ew")
-        ttk.Label(p,text="Drive").grid(row=1,column=0,sticky="e",pady=4)
-        self.drive = tk.StringVar(value=str(self.cfg["drive"])); ttk.Entry(p,textvariable=self.drive,width=8).grid(row=1,column=1,sticky="w")
-        ttk.Label(p,text="Tracks").grid(row=1,column=2,sticky="e")
-        self.tracks=tk.StringVar(value=self.cfg["tracks"]); ttk.Entry(p,textvariable=self.tracks,width=16).grid(row=1,column=3,sticky="w")
-        ttk.Label(p,text="Revs").grid(row=1,column=4,sticky="e")
-        self.revs  = tk.StringVar(value=str(self.cfg["revs"])); ttk.Entry(p,textvariable=self.revs,width=8).grid(row=1,column=5,sticky="w")
-
-        # Commands
-        c = ttk.LabelFrame(f,text="Commands (editable)"); c.grid(row=2,column=0,sticky="ew")
-        c.columnconfigure(1, weight=1)
-        ttk.Label(c,text="Read").grid(row=0,column=0,sticky="e")
-        self.read_cmd = tk.StringVar(value=self.cfg["read_cmd"])
-        ttk.Entry(c,textvariable=self.read_cmd).grid(row=0,column=1,sticky="ew")
-        ttk.Label(c,text="Convert").grid(row=1,column=0,sticky="e",pady=4)
-        self.conv_cmd = tk.StringVar(value=self.cfg["convert_cmd"])
-        ttk.Entry(c,textvariable=self.conv_cmd).grid(row=1,column=1,sticky="ew",pady=4)
-        ttk.Label(f,text="Placeholders: {gw} {sugar} {scp} {dsk} (no ext) {drive} {tracks} {revs}",foreground="#555")\
-            .grid(row=3,column=0,sticky="w",pady=(0,4))
-
-        # Status + button
-        sbar = ttk.Frame(f); sbar.grid(row=4,column=0,sticky="ew"); sbar.columnconfigure(0,weight=1)
-        self.status = tk.StringVar(value="…"); ttk.Label(sbar,textvariable=self.status).grid(row=0,column=0,sticky="w")
-        self.btn = ttk.Button(sbar,text="Image Disk",command=self.image_disk); self.btn.grid(row=0,column=1,sticky="e",padx=4)
-
-        # Log
-        l = ttk.LabelFrame(f,text="Live output"); l.grid(row=5,column=0,sticky="nsew"); f.rowconfigure(5,weight=1)
-        self.log = scrolledtext.ScrolledText(l,wrap=tk.WORD,height=12); self.log.pack(fill="both",expand=True,padx=6,pady=6)
-
-    # ---------- helpers ----------
-    def browse_gw(self):
-        p = filedialog.askopenfilename(title="Select gw executable")
-        if p:
-            self.custom_gw.set(p)
+@functools.lru_cache(maxsize=1)
+def _imager_class():
+    import tkinter as tk
+    from tkinter import filedialog, scrolledtext, ttk
+
+    class Imager(ttk.Frame):
+        def __init__(self, master):
+            super().__init__(master)
+            self.master = master
+            self._resolve_cache: Dict[Tuple[str,str], Tuple[Optional[str],str]] = {}
+            self._log_pending: List[str] = [];  self._log_lock = threading.Lock();  self._log_flush_due = False
+            self.cfg = cfg_defaults(load_cfg())
+            self._ui()
+            self.append("Einstein Disk Imager v" + __VERSION__)
+            self.master.after(200, self.run_checks)
+
+        # ---------- UI ----------
+        def _ui(self):
+            self.master.title(f"Einstein Disk Imager v{__VERSION__}")
+            style = ttk.Style()
+            if "vista" in style.theme_names():  style.theme_use("vista")
+            self.master.geometry("900x720"); self.master.minsize(860,640)
+
+            f = ttk.Frame(self, padding=8);  f.pack(fill="both", expand=True)
+            f.columnconfigure(0, weight=1)
+            # Executables
+            g = ttk.LabelFrame(f, text="Executables"); g.grid(row=0,column=0,sticky="ew")
+            for col in (1,): g.columnconfigure(col, weight=1)
+            self.gw_lab  = tk.StringVar();  self.sugar_lab = tk.StringVar()
+            ttk.Label(g,text="Resolved gw").grid(row=0,column=0,sticky="w"); ttk.Label(g,textvariable=self.gw_lab).grid(row=0,column=1,sticky="w")
+            ttk.Label(g,text="Resolved SugarConvDsk").grid(row=1,column=0,sticky="w"); ttk.Label(g,textvariable=self.sugar_lab).grid(row=1,column=1,sticky="w")
+            ttk.Label(g,text="Custom gw path (optional)").grid(row=2,column=0,sticky="w",pady=4)
+            self.custom_gw = tk.StringVar(value=self.cfg["custom_gw"])
+            ttk.Entry(g,textvariable=self.custom_gw).grid(row=2,column=1,sticky="ew"); ttk.Button(g,text="Browse…",command=self.browse_gw).grid(row=2,column=2)
+            ttk.Label(g,text="Custom SugarConvDsk path (optional)").grid(row=3,column=0,sticky="w")
+            self.custom_sugar = tk.StringVar(value=self.cfg["custom_sugar"])
+            ttk.Entry(g,textvariable=self.custom_sugar).grid(row=3,column=1,sticky="ew"); ttk.Button(g,text="Browse…",command=self.browse_sugar).grid(row=3,column=2)
+            ttk.Button(g,text="Recheck",command=self.run_checks).grid(row=4,column=0,sticky="w",pady=6)
+
+            # Parameters
+            p = ttk.LabelFrame(f,text="Output and parameters"); p.grid(row=1,column=0,sticky="ew",pady=6)
+            p.columnconfigure(1, weight=1)
+            ttk.Label(p,text="Base name").grid(row=0,column=0,sticky="e")
+            self.basename = tk.StringVar(value=self.cfg["basename"])
+            ttk.Entry(p,textvariable=self.basename).grid(row=0,column=1,columnspan=5,sticky="ew")
+            ttk.Label(p,text="Drive").grid(row=1,column=0,sticky="e",pady=4)
+            self.drive = tk.StringVar(value=str(self.cfg["drive"])); ttk.Entry(p,textvariable=self.drive,width=8).grid(row=1,column=1,sticky="w")
+            ttk.Label(p,text="Tracks").grid(row=1,column=2,sticky="e")
+            self.tracks=tk.StringVar(value=self.cfg["tracks"]); ttk.Entry(p,textvariable=self.tracks,width=16).grid(row=1,column=3,sticky="w")
+            ttk.Label(p,text="Revs").grid(row=1,column=4,sticky="e")
+            self.revs  = tk.StringVar(value=str(self.cfg["revs"])); ttk.Entry(p,textvariable=self.revs,width=8).grid(row=1,column=5,sticky="w")
+
+            # Commands
+            c = ttk.LabelFrame(f,text="Commands (editable)"); c.grid(row=2,column=0,sticky="ew")
+            c.columnconfigure(1, weight=1)
+            ttk.Label(c,text="Read").grid(row=0,column=0,sticky="e")
+            self.read_cmd = tk.StringVar(value=self.cfg["read_cmd"])
+            ttk.Entry(c,textvariable=self.read_cmd).grid(row=0,column=1,sticky="ew")
+            ttk.Label(c,text="Convert").grid(row=1,column=0,sticky="e",pady=4)
+            self.conv_cmd = tk.StringVar(value=self.cfg["convert_cmd"])
+            ttk.Entry(c,textvariable=self.conv_cmd).grid(row=1,column=1,sticky="ew",pady=4)
+            ttk.Label(f,text="Placeholders: {gw} {sugar} {scp} {dsk} (no ext) {drive} {tracks} {revs}",foreground="#555")\
+                .grid(row=3,column=0,sticky="w",pady=(0,4))
+
+            # Status + button
+            sbar = ttk.Frame(f); sbar.grid(row=4,column=0,sticky="ew"); sbar.columnconfigure(0,weight=1)
+            self.status = tk.StringVar(value="…"); ttk.Label(sbar,textvariable=self.status).grid(row=0,column=0,sticky="w")
+            self.btn = ttk.Button(sbar,text="Image Disk",command=self.image_disk); self.btn.grid(row=0,column=1,sticky="e",padx=4)
+
+            # Log
+            l = ttk.LabelFrame(f,text="Live output"); l.grid(row=5,column=0,sticky="nsew"); f.rowconfigure(5,weight=1)
+            self.log = scrolledtext.ScrolledText(l,wrap=tk.WORD,height=12); self.log.pack(fill="both",expand=True,padx=6,pady=6)
+
+        # ---------- helpers ----------
+        def browse_gw(self):
+            p = filedialog.askopenfilename(title="Select gw executable")
+            if p:
+                self.custom_gw.set(p); self._resolve_cache.clear()
+                self._save_current_cfg()
+
+        def browse_sugar(self):
+            p = filedialog.askopenfilename(title="Select SugarConvDsk executable")
+            if p:
+                self.custom_sugar.set(p); self._resolve_cache.clear()
+                self._save_current_cfg()
+
+        def append(self,text:str):
+            # coalesce chatty gw output: queue the line, render at most every LOG_FLUSH_MS
+            with self._log_lock:
+                self._log_pending.append(text)
+                if self._log_flush_due: return
+                self._log_flush_due = True
+            self.after(LOG_FLUSH_MS, self._flush_log)
+
+        def _flush_log(self):
+            with self._log_lock:
+                batch, self._log_pending = self._log_pending, []
+                self._log_flush_due = False
+            if not batch: return
+            self.log.configure(state=tk.NORMAL)
+            self.log.insert("end","\n".join(batch)+"\n"); self.log.see("end"); self.log.configure(state=tk.DISABLED)
+
+        def _clear_log(self):
+            with self._log_lock:  self._log_pending = []
+            self.log.configure(state=tk.NORMAL); self.log.delete("1.0","end"); self.log.configure(state=tk.DISABLED)
+
+        def _current_cfg(self) -> dict:
+            return cfg_defaults({
+                **self.cfg,
+                "custom_gw":    self.custom_gw.get().strip(),
+                "custom_sugar": self.custom_sugar.get().strip(),
+                "drive":        self.drive.get().strip(),
+                "tracks":       self.tracks.get().strip(),
+                "revs":         self.revs.get().strip(),
+                "basename":     self.basename.get().strip(),
+                "read_cmd":     self.read_cmd.get().strip(),
+                "convert_cmd":  self.conv_cmd.get().strip(),
+            })
+
+        def _save_current_cfg(self):
+            save_cfg(self._current_cfg())
+
+        def run_checks(self):
+            self._resolve_cache.clear()
             self._save_current_cfg()
+            self.btn.state(["disabled"]); self.status.set("Pre-flight…")
 
-    def browse_sugar(self):
-        p = filedialog.askopenfilename(title="Select SugarConvDsk executable")
-        if p:
-            self.custom_sugar.set(p)
-            self._save_current_cfg()
+            self._clear_log()
+            threading.Thread(target=self._checks_thread,daemon=True).start()
 
-    def append(self,text:str):
-        self.log.configure(state=tk.NORMAL)
-        self.log.insert("end",text+"\n"); self.log.see("end"); self.log.configure(state=tk.DISABLED)
-
-    def _save_current_cfg(self):
-        cfg = {
-            **self.cfg,
-            "custom_gw":    self.custom_gw.get().strip(),
-            "custom_sugar": self.custom_sugar.get().strip(),
-            "drive":        self.drive.get().strip(),
-            "tracks":       self.tracks.get().strip(),
-            "revs":         self.revs.get().strip(),
-            "basename":     self.basename.get().strip(),
-            "read_cmd":     self.read_cmd.get().strip(),
-            "convert_cmd":  self.conv_cmd.get().strip(),
-        }
-        save_cfg(self._defaults(cfg))
-
-    def run_checks(self):
-        self._save_current_cfg()
-        self.btn.state(["disabled"]); self.status.set("Pre-flight…")
-
-        self.log.configure(state=tk.NORMAL); self.log.delete("1.0","end"); self.log.configure(state=tk.DISABLED)
-        threading.Thread(target=self._checks_thread,daemon=True).start()
-
-    def _resolve(self,name:str,custom:str)->Tuple[Optional[str],str]:
-        msgs=[]
-        p = shutil.which(name)
-        if p:
-            msgs.append(f"✅ {name} found on PATH: {p}")
-            return p, msgs[-1]
-        if name=="SugarConvDsk" and not custom:
-            for c in SUGAR_FALLBACKS:
-                c = _maybe_exe(Path(c))
-                if c.exists() and os.access(str(c), os.X_OK):
-                    msgs.append(f"✅ {name} resolved via fallback: {c}")
-                    return str(c), msgs[-1]
-        if custom:
-            cp = _maybe_exe(Path(custom).expanduser())
-            if cp.exists() and os.access(str(cp), os.X_OK):
-                msgs.append(f"✅ {name} resolved via custom path: {cp}")
-                return str(cp), msgs[-1]
-            msgs.append(f"❌ custom path for {name} is not executable: {cp}")
-        else:
-            msgs.append(f"❌ {name} not found. Provide a path.")
-        return None, msgs[-1]
-
-
-    def _checks_thread(self):
-        ok=True; msgs=[]
-        gw, m = self._resolve("gw", self.custom_gw.get()); msgs.append(m)
-        self.gw_lab.set(gw or "(not resolved)")
-        if not gw: ok=False
-        else:
-            rc,out = run_cap([gw,"--help"])
-            if not help_ok(out): ok=False; msgs.append("❌ 'gw --help' failed")
-            else:
-                rc,out2=run_cap([gw,"info"])
-                if rc!=0: ok=False; msgs.append("❌ 'gw info' failed (device?)")
-        sugar,m = self._resolve("SugarConvDsk", self.custom_sugar.get()); msgs.append(m)
-        self.sugar_lab.set(sugar or "(not resolved)")
-        if not sugar: ok=False
-        self.append("\n".join(msgs))
-        self.status.set("Ready." if ok else "Pre-flight failed"); 
-        if ok: self.btn.state(["!disabled"])
-
-    # ---------- main imaging ----------
-    def image_disk(self):
-        self.btn.state(["disabled"]); self.status.set("Imaging…")
-        threading.Thread(target=self._img_thread,daemon=True).start()
-
-    def _img_thread(self):
-        gw,_ = self._resolve("gw", self.custom_gw.get()); sugar,_ = self._resolve("SugarConvDsk", self.custom_sugar.get())
-        if not (gw and sugar):
-            self.append("Executables unresolved."); self.status.set("Pre-flight failed"); return
-        # paths & subs
-        desk=desktop_path(); base=self.basename.get().strip() or f"{DEFAULT_BASENAME_PRE}_{ts_string()}"
-        scp=desk/f"{base}.scp"; outbase=desk/base; exp_dsk=desk/f"{base}.DSK"
-        subs=dict(gw=gw,sugar=sugar,scp=str(scp),dsk=str(outbase),
-                  drive=self.drive.get().strip() or DEFAULT_DRIVE_INDEX,
-                  tracks=self.tracks.get().strip() or DEFAULT_TRACKS_ARG,
-                  revs=self.revs.get().strip() or DEFAULT_REVS)
-        read_cmd=[gw,"read","--drive="+str(subs["drive"]),
-                  "--tracks="+subs["tracks"],"--revs="+str(subs["revs"]), str(scp)]
-        # honour custom template
-        read_cmd=split_cmd(self.read_cmd.get().format(**subs))
-        conv_cmd=split_cmd(self.conv_cmd.get().format(**subs))
-        self.append(f"\nRunning (read): {shjoin(read_cmd)}")
-        t0=time.time(); rc=run_stream(read_cmd,self.append); t1=time.time(); self.append(f"[exit {rc} in {t1-t0:.1f}s]")
-        if rc or not scp.exists(): self.append("Read failed."); self.status.set("Read failed"); return
-        self.append(f"\nRunning (convert): {shjoin(conv_cmd)}")
-        rc2=run_stream(conv_cmd,self.append); t2=time.time(); self.append(f"[exit {rc2} in {t2-t1:.1f}s]")
-        dsk=detect_output(exp_dsk,base)
-        if rc2 or not dsk: self.append("Convert failed."); self.status.set("Convert failed"); return
-        # hashes + summary
-        h_scp=file_hashes(scp); h_dsk=file_hashes(dsk)
-        def fmt(n,h): return f"{n}\n  MD5 {h['md5']}\n  SHA1 {h['sha1']}\n  SHA256 {h['sha256']}\n"
-        self.append("\n"+fmt("SCP",h_scp)+fmt("DSK",h_dsk))
-        self.append("===== Imaging complete ====="); self.status.set("Done"); self.btn.state(["!disabled"])
-        # save session
-        sess={"version":__VERSION__,"scp":str(scp),"dsk":str(dsk),"hashes":{"scp":h_scp,"dsk":h_dsk}}
-        (desk/f"{base}_session.json").write_text(json.dumps(sess,indent=2))
+        def _resolve(self,name:str,custom:str)->Tuple[Optional[str],str]:
+            # memoized per (name, custom); cleared by Recheck / Browse…
+            key=(name,custom)
+            if key not in self._resolve_cache:
+                self._resolve_cache[key]=resolve_exe(name,custom)
+            return self._resolve_cache[key]
+
+        def _checks_thread(self):
+            ok,gw,sugar = preflight(self._current_cfg(), self.append, self._resolve)
+            self.gw_lab.set(gw or "(not resolved)"); self.sugar_lab.set(sugar or "(not resolved)")
+            self.status.set("Ready." if ok else "Pre-flight failed")
+            if ok: self.btn.state(["!disabled"])
+
+        # ---------- main imaging ----------
+        def image_disk(self):
+            self.btn.state(["disabled"]); self.status.set("Imaging…")
+            threading.Thread(target=self._img_thread,daemon=True).start()
+
+        def _img_thread(self):
+            status = run_imaging(self._current_cfg(), self.append, self._resolve)
+            self.status.set(status)
+            if status == "Done": self.btn.state(["!disabled"])
+
+    return Imager
 
 # ──────────── run ───────────
-if __name__ == "__main__":
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=f"Einstein Disk Imager v{__VERSION__}")
+    ap.add_argument("--no-gui", action="store_true", help="image one disk headless, using the saved config")
+    ap.add_argument("--check",  action="store_true", help="run the pre-flight checks only")
+    ap.add_argument("--basename");  ap.add_argument("--drive")
+    ap.add_argument("--tracks");    ap.add_argument("--revs")
+    args = ap.parse_args(argv)
+    if args.no_gui or args.check:
+        cfg = cfg_defaults(load_cfg())
+        # a fresh base name per run, never the last GUI session's
+        cfg["basename"] = args.basename or f"{DEFAULT_BASENAME_PRE}_{ts_string()}"
+        for k in ("drive","tracks","revs"):
+            if getattr(args, k) is not None:  cfg[k] = getattr(args, k)
+        ok,_,_ = preflight(cfg)
+        if args.check or not ok:  return 0 if ok else 1
+        return 0 if run_imaging(cfg) == "Done" else 1     # run_imaging already logged the outcome
+
+    import tkinter as tk
     root = tk.Tk()
-    app = Imager(root)
+    app = _imager_class()(root)
     app.pack(fill="both", expand=True)
     def _on_close():
         try:
@@ -328,3 +515,7 @@ if __name__ == "__main__":
         root.destroy()
     root.protocol("WM_DELETE_WINDOW", _on_close)
     root.mainloop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
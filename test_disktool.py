@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+import disktool
+from disktool import _LineSplitter, compile_template, detect_output, fill_template, write_atomic
+
+
+def split(*chunks: bytes):
+    out = [];  sp = _LineSplitter(out.append)
+    for c in chunks:  sp.feed(c)
+    sp.close()
+    return out
+
+
+def test_newlines_match_universal_mode():
+    assert split(b"a\r\nb\rc\n\nd") == ["a", "b", "c", "", "d"]
+
+
+def test_crlf_split_across_chunks():
+    assert split(b"a\r", b"\nb") == ["a", "b"]
+    assert split(b"a\r", b"b\r", b"") == ["a", "b"]
+
+
+def test_lone_cr_at_eof_ends_an_empty_line():
+    assert split(b"a\n\r") == ["a", ""]
+    assert split(b"a\r") == ["a"]
+
+
+def test_multibyte_split_across_chunks():
+    e = "é".encode("utf-8")
+    assert split(b"caf" + e[:1], e[1:] + b"\nx") == ["café", "x"]
+
+
+def test_invalid_utf8_is_replaced():
+    assert split(b"a\xff\n") == ["a�"]
+
+
+def test_trailing_partial_line_flushed_on_close():
+    assert split(b"one\ntwo") == ["one", "two"]
+    assert split(b"") == []
+
+
+def test_detect_output_prefers_exact_names(tmp_path):
+    (tmp_path / "disk_extra.edsk").write_bytes(b"")
+    (tmp_path / "disk.dsk").write_bytes(b"")
+    assert detect_output(tmp_path / "disk.DSK", "disk") == tmp_path / "disk.dsk"
+    (tmp_path / "disk.DSK").write_bytes(b"")
+    assert detect_output(tmp_path / "disk.DSK", "disk") == tmp_path / "disk.DSK"
+
+
+def test_detect_output_prefix_fallback(tmp_path):
+    (tmp_path / "disk_1.txt").write_bytes(b"")
+    (tmp_path / "disk_1.EDSK").mkdir()
+    assert detect_output(tmp_path / "disk.DSK", "disk") is None
+    (tmp_path / "disk_2.EdSk").write_bytes(b"")
+    assert detect_output(tmp_path / "disk.DSK", "disk") == tmp_path / "disk_2.EdSk"
+    assert detect_output(tmp_path / "missing" / "disk.DSK", "disk") is None
+
+
+SUBS = dict(gw="C:\\gw.exe", scp="/a b.scp", drive=0, tracks="c=0-39:h=0", revs=3)
+
+
+@pytest.mark.parametrize("tmpl", [
+    "{gw} read --drive={drive} --tracks={tracks} --revs={revs} {scp}",
+    "literal {{braces}} {scp}",
+    "{drive:>4}|{revs:03d}",
+    "{gw!r} {scp!s}",
+    "",
+])
+def test_fill_template_matches_str_format(tmpl):
+    assert fill_template(tmpl, SUBS) == tmpl.format(**SUBS)
+
+
+def test_compile_template_falls_back_for_spec_and_conversion():
+    assert compile_template("{drive:>4}") is None
+    assert compile_template("{gw!r}") is None
+    assert compile_template("{{x}} {scp}") is not None     # escaped braces stay on the fast path
+
+
+def test_fill_template_unknown_key_raises_like_format():
+    with pytest.raises(KeyError):
+        fill_template("{nope}", SUBS)
+
+
+def test_write_atomic_replaces_contents(tmp_path):
+    p = tmp_path / "s.json";  p.write_bytes(b"old")
+    write_atomic(p, b"new")
+    assert p.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["s.json"]
+
+
+def test_write_atomic_cleans_up_when_replace_fails(tmp_path, monkeypatch):
+    p = tmp_path / "s.json";  p.write_bytes(b"old")
+    def boom(*a):  raise OSError("replace failed")
+    monkeypatch.setattr(disktool.os, "replace", boom)
+    with pytest.raises(OSError):
+        write_atomic(p, b"new")
+    assert p.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["s.json"]